@@ -0,0 +1,83 @@
+"""
+Throughput benchmark for POST /geocode:batch on 10k-address inputs.
+
+Google is replaced by a fake client that sleeps for a fixed latency per call, so the
+numbers show what deduplication, the geocode cache and bounded concurrency buy.
+
+Usage (from the backend directory):
+
+    python -m benchmarks.geocode_batch [--addresses 10000] [--unique 2500] [--latency-ms 20]
+"""
+import argparse
+import random
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+from main import MAX_GEOCODE_BATCH_SIZE, Services, create_app
+
+
+class FakeGoogleMapsClient:
+    """Stands in for googlemaps.Client with a fixed per-call latency."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def geocode(self, address: str):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency)
+        return [{
+            "geometry": {"location": {"lat": 37.0 + len(address) / 1000, "lng": -122.0}},
+            "formatted_address": address,
+        }]
+
+
+def make_addresses(count: int, unique: int, seed: int = 0) -> list:
+    """Build `count` addresses drawn from `unique` places, spelled in trivially different ways."""
+    rng = random.Random(seed)
+    variants = [
+        lambda a: a,
+        lambda a: a.upper(),
+        lambda a: f"  {a}  ",
+        lambda a: f"{a}, USA",
+        lambda a: a.replace(", ", ","),
+    ]
+    places = [f"{n} Main St, Springfield {n % 50}, CA" for n in range(unique)]
+    return [rng.choice(variants)(rng.choice(places)) for _ in range(count)]
+
+
+def run(addresses: list, latency: float, concurrency: int) -> None:
+    fake = FakeGoogleMapsClient(latency)
+    app = create_app(Services(api_key=None, geocode_concurrency=concurrency, gmaps_client=fake))
+
+    with TestClient(app) as client:
+        for label in ("cold cache", "warm cache"):
+            calls_before = fake.calls
+            start = time.perf_counter()
+            response = client.post("/geocode:batch", json={"addresses": addresses})
+            elapsed = time.perf_counter() - start
+            response.raise_for_status()
+            print(
+                f"{label:>10}: {len(addresses)} addresses in {elapsed:.3f}s "
+                f"({len(addresses) / elapsed:,.0f} addresses/s, {fake.calls - calls_before} Google calls)"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--addresses", type=int, default=MAX_GEOCODE_BATCH_SIZE)
+    parser.add_argument("--unique", type=int, default=2500)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    addresses = make_addresses(args.addresses, args.unique)
+    run(addresses, args.latency_ms / 1000, args.concurrency)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,309 @@
 import os
+import re
 import time
-from typing import Optional, List
-from fastapi import FastAPI, Query, HTTPException
+import json
+import sqlite3
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Optional, List, NamedTuple, Hashable, Dict, Iterable
+from fastapi import APIRouter, Depends, FastAPI, Query, HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-import googlemaps
+from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Restaurant Finder API")
+router = APIRouter()
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+# How long serialized responses are reused before Google is queried again
+DEFAULT_CACHE_TTL_SECONDS = 300
+# Upper bound on cached responses; least recently used entries are evicted first
+DEFAULT_CACHE_MAX_ENTRIES = 1024
+
+# Batch geocoding limits
+MAX_GEOCODE_BATCH_SIZE = 10000
+DEFAULT_GEOCODE_CONCURRENCY = 8
+
+# Country suffixes that don't change where an address resolves to
+_COUNTRY_SUFFIXES = {"usa", "u.s.a", "us", "u.s", "united states", "united states of america"}
+# The same suffixes attached without a comma, but only right after a state code or ZIP
+# ("..., CA USA", "..., 94103 US") so ordinary words like "Eat With Us" survive; longest first
+_TRAILING_COUNTRY = re.compile(
+    r"(\b[a-z]{2}|\b\d{5}(?:-\d{4})?)\s+(?:"
+    + "|".join(re.escape(suffix) for suffix in sorted(_COUNTRY_SUFFIXES, key=len, reverse=True))
+    + r")$"
 )
 
-# Initialize Google Maps client
-GOOGLE_API_KEY = os.getenv("GOOGLE_PLACES_API_KEY")
-if not GOOGLE_API_KEY:
-    raise ValueError("GOOGLE_PLACES_API_KEY environment variable is required")
 
-gmaps = googlemaps.Client(key=GOOGLE_API_KEY)
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: str
+    expires_at: float
+
+
+class ResponseCache:
+    """
+    In-memory TTL + LRU cache of serialized JSON responses with content-hash ETags.
+    """
+
+    def __init__(self, ttl: int, max_entries: int = DEFAULT_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: Hashable, payload) -> CachedResponse:
+        body = json.dumps(jsonable_encoder(payload), separators=(",", ":")).encode("utf-8")
+        etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        now = time.monotonic()
+        entry = CachedResponse(body=body, etag=etag, expires_at=now + self.ttl)
+        for stale_key in [k for k, e in self._entries.items() if e.expires_at <= now]:
+            del self._entries[stale_key]
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+def normalize_address(address: str) -> str:
+    """
+    Canonical form of an address for cache lookups: lowercase, single spaces,
+    tidy comma separators and no trailing country suffix (", USA").
+    """
+    text = " ".join(address.lower().split())
+    parts = [part.strip(" .") for part in text.split(",")]
+    parts = [part for part in parts if part]
+    # Keep the country when dropping it would leave a bare place name ("Paris, USA" is not "Paris")
+    while len(parts) > 2 and parts[-1] in _COUNTRY_SUFFIXES:
+        parts.pop()
+    # Only for multi-part addresses, so a bare name like "Cafe Us" is left alone
+    if len(parts) > 1:
+        parts[-1] = _TRAILING_COUNTRY.sub(r"\1", parts[-1])
+    return ", ".join(parts)
+
+
+class GeocodeCache:
+    """
+    Normalized address -> coordinates cache stored in SQLite, so results survive restarts.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        # Opened on first use so that building the app does not touch the disk; call with the lock held
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS geocode ("
+                "address TEXT PRIMARY KEY, lat REAL NOT NULL, lng REAL NOT NULL, formatted_address TEXT)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def get(self, address: str) -> Optional[dict]:
+        return self.get_many([address]).get(address)
+
+    def get_many(self, addresses: Iterable[str]) -> Dict[str, dict]:
+        addresses = list(addresses)
+        found = {}
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit
+            for i in range(0, len(addresses), 500):
+                chunk = addresses[i:i + 500]
+                rows = self._connection().execute(
+                    f"SELECT address, lat, lng, formatted_address FROM geocode WHERE address IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                )
+                for address, lat, lng, formatted_address in rows:
+                    found[address] = {"lat": lat, "lng": lng, "formatted_address": formatted_address}
+        return found
+
+    def set(self, address: str, location: dict) -> None:
+        self.set_many({address: location})
+
+    def set_many(self, locations: Dict[str, dict]) -> None:
+        if not locations:
+            return
+        with self._lock:
+            conn = self._connection()
+            conn.executemany(
+                "INSERT OR REPLACE INTO geocode (address, lat, lng, formatted_address) VALUES (?, ?, ?, ?)",
+                [
+                    (address, location["lat"], location["lng"], location.get("formatted_address"))
+                    for address, location in locations.items()
+                ],
+            )
+            conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class Services:
+    """
+    Process-wide resources owned by one app instance.
+
+    The Google Maps client (and the HTTP connection pool behind it) is created on
+    first use or by the background warm-up, so importing and starting the app
+    never blocks on it and a missing API key only fails the requests that need it.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str],
+        cache_ttl: int = DEFAULT_CACHE_TTL_SECONDS,
+        cache_max_entries: int = DEFAULT_CACHE_MAX_ENTRIES,
+        geocode_cache_path: str = ":memory:",
+        geocode_concurrency: int = DEFAULT_GEOCODE_CONCURRENCY,
+        gmaps_client=None,
+    ):
+        self.api_key = api_key
+        self.response_cache = ResponseCache(ttl=cache_ttl, max_entries=cache_max_entries)
+        self.geocode_cache = GeocodeCache(geocode_cache_path)
+        # At least one worker, otherwise batches with cache misses would never finish
+        self.geocode_concurrency = max(1, geocode_concurrency)
+        # A client passed in (e.g. a test double) is used as-is and not closed by us
+        self._gmaps = gmaps_client
+        self._owns_gmaps = gmaps_client is None
+        self._gmaps_error: Optional[str] = None
+        self._gmaps_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "Services":
+        load_dotenv()
+        return cls(
+            api_key=os.getenv("GOOGLE_PLACES_API_KEY"),
+            cache_ttl=int(os.getenv("CACHE_TTL_SECONDS", str(DEFAULT_CACHE_TTL_SECONDS))),
+            cache_max_entries=int(os.getenv("CACHE_MAX_ENTRIES", str(DEFAULT_CACHE_MAX_ENTRIES))),
+            geocode_cache_path=os.getenv("GEOCODE_CACHE_PATH", "geocode_cache.sqlite3"),
+            geocode_concurrency=int(os.getenv("GEOCODE_BATCH_CONCURRENCY", str(DEFAULT_GEOCODE_CONCURRENCY))),
+        )
+
+    @property
+    def gmaps(self):
+        if self._gmaps is None:
+            with self._gmaps_lock:
+                if self._gmaps is None:
+                    if not self.api_key:
+                        raise RuntimeError("GOOGLE_PLACES_API_KEY environment variable is required")
+                    if self._gmaps_error is not None:
+                        raise RuntimeError(self._gmaps_error)
+                    # Imported here so that `import main` stays cheap
+                    import googlemaps
+                    try:
+                        self._gmaps = googlemaps.Client(key=self.api_key)
+                    except ValueError as e:
+                        # e.g. a malformed key; remember it rather than rebuilding on every request
+                        self._gmaps_error = f"Invalid GOOGLE_PLACES_API_KEY: {str(e)}"
+                        raise RuntimeError(self._gmaps_error) from e
+        return self._gmaps
+
+    def warm_up(self) -> None:
+        if self._gmaps is not None:
+            return
+        if not self.api_key:
+            logger.warning("GOOGLE_PLACES_API_KEY is not set; Google-backed endpoints will return 503")
+            return
+        try:
+            self.gmaps
+        except RuntimeError as e:
+            logger.warning("%s; Google-backed endpoints will return 503", e)
+        except Exception:
+            logger.exception("Failed to initialize Google Maps client")
+
+    def close(self) -> None:
+        if self._gmaps is not None and self._owns_gmaps:
+            self._gmaps.session.close()
+            self._gmaps = None
+        self.response_cache.clear()
+        self.geocode_cache.close()
+
+
+def get_services(request: Request) -> Services:
+    return request.app.state.services
+
+
+def get_gmaps(services: Services = Depends(get_services)):
+    try:
+        return services.gmaps
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+def get_response_cache(services: Services = Depends(get_services)) -> ResponseCache:
+    return services.response_cache
+
+
+def get_geocode_cache(services: Services = Depends(get_services)) -> GeocodeCache:
+    return services.geocode_cache
+
+
+def geocode_uncached(gmaps, address: str) -> Optional[dict]:
+    """
+    Look an address up with Google, returning None when nothing matches.
+    """
+    geocode_result = gmaps.geocode(address)
+    if not geocode_result:
+        return None
+    location = geocode_result[0]["geometry"]["location"]
+    return {
+        "lat": location["lat"],
+        "lng": location["lng"],
+        "formatted_address": geocode_result[0].get("formatted_address"),
+    }
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag using weak comparison.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return etag in [tag[2:] if tag.startswith("W/") else tag for tag in candidates]
+
+
+def cached_json_response(request: Request, entry: CachedResponse) -> Response:
+    """
+    Build a 200 response from a cache entry, or a bodyless 304 if the client already has it.
+    """
+    max_age = max(0, int(entry.expires_at - time.monotonic()))
+    headers = {
+        "ETag": entry.etag,
+        "Cache-Control": f"public, max-age={max_age}",
+    }
+    if etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
 
 
 # Response models
@@ -59,13 +337,28 @@ class RestaurantDetail(BaseModel):
     photos: Optional[List[str]] = None
 
 
-@app.get("/health")
+class GeocodeBatchRequest(BaseModel):
+    addresses: List[str] = Field(..., max_length=MAX_GEOCODE_BATCH_SIZE)
+
+
+class GeocodeBatchResult(BaseModel):
+    address: str
+    lat: Optional[float] = None
+    lng: Optional[float] = None
+    formatted_address: Optional[str] = None
+    error: Optional[str] = None
+
+
+@router.get("/health")
 async def health() -> dict:
     return {"status": "ok"}
 
 
-@app.get("/autocomplete")
-async def autocomplete_places(input: str = Query(..., description="Input text for autocomplete")):
+@router.get("/autocomplete")
+async def autocomplete_places(
+    input: str = Query(..., description="Input text for autocomplete"),
+    gmaps=Depends(get_gmaps),
+):
     """
     Get place suggestions using Google Places Autocomplete API.
     """
@@ -87,34 +380,145 @@ async def autocomplete_places(input: str = Query(..., description="Input text fo
         raise HTTPException(status_code=500, detail=f"Error getting autocomplete suggestions: {str(e)}")
 
 
-@app.get("/geocode")
-async def geocode_address(address: str = Query(..., description="Address or location to geocode")):
+@router.get("/geocode")
+async def geocode_address(
+    request: Request,
+    address: str = Query(..., description="Address or location to geocode"),
+    services: Services = Depends(get_services),
+    response_cache: ResponseCache = Depends(get_response_cache),
+    geocode_cache: GeocodeCache = Depends(get_geocode_cache),
+):
     """
     Geocode an address or location string to get coordinates (lat, lng).
     """
-    try:
-        geocode_result = gmaps.geocode(address)
-        
-        if not geocode_result:
-            raise HTTPException(status_code=404, detail="Address not found")
-        
-        location = geocode_result[0]["geometry"]["location"]
+    cache_key = ("geocode", address)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return cached_json_response(request, cached)
+
+    # SQLite work runs off the event loop; a cache failure degrades to asking Google
+    normalized = normalize_address(address)
+    payload = None
+    if normalized:
+        try:
+            payload = await asyncio.to_thread(geocode_cache.get, normalized)
+        except Exception:
+            logger.exception("Failed to read geocode cache")
+
+    if payload is None:
+        # The Google client (and API key) is only needed on a cache miss
+        try:
+            gmaps = await asyncio.to_thread(lambda: services.gmaps)
+        except RuntimeError as e:
+            raise HTTPException(status_code=503, detail=str(e))
+
+        try:
+            payload = geocode_uncached(gmaps, address)
+            
+            if payload is None:
+                raise HTTPException(status_code=404, detail="Address not found")
         
-        return {
-            "lat": location["lat"],
-            "lng": location["lng"],
-            "formatted_address": geocode_result[0].get("formatted_address"),
-        }
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error geocoding address: {str(e)}")
+
+        if normalized:
+            try:
+                await asyncio.to_thread(geocode_cache.set, normalized, payload)
+            except Exception:
+                logger.exception("Failed to write geocode cache")
+
+    return cached_json_response(request, response_cache.set(cache_key, payload))
+
+
+@router.post("/geocode:batch")
+async def geocode_batch(
+    batch: GeocodeBatchRequest,
+    geocode_cache: GeocodeCache = Depends(get_geocode_cache),
+    services: Services = Depends(get_services),
+) -> dict:
+    """
+    Geocode many addresses at once.
     
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error geocoding address: {str(e)}")
+    Addresses are normalized and de-duplicated, resolved from the geocode cache where
+    possible, and only the misses are sent to Google (with bounded concurrency).
+    Results come back in input order; failures are reported per item in `error`.
+    The Google client is only needed (and a missing API key only matters) for misses.
+    """
+    normalized = [normalize_address(address) for address in batch.addresses]
+
+    # First raw spelling of each normalized address is the one sent to Google
+    unique: Dict[str, str] = {}
+    for address, key in zip(batch.addresses, normalized):
+        if key and key not in unique:
+            unique[key] = address.strip()
+
+    # SQLite work runs off the event loop; a cache failure degrades to fetching from Google
+    try:
+        resolved = await asyncio.to_thread(geocode_cache.get_many, list(unique))
+    except Exception:
+        logger.exception("Failed to read geocode cache")
+        resolved = {}
+    misses = [key for key in unique if key not in resolved]
+    errors: Dict[str, str] = {}
+
+    gmaps = None
+    if misses:
+        try:
+            gmaps = await asyncio.to_thread(lambda: services.gmaps)
+        except RuntimeError as e:
+            errors.update({key: str(e) for key in misses})
+            misses = []
+
+    semaphore = asyncio.Semaphore(services.geocode_concurrency)
+
+    async def fetch(key: str) -> None:
+        async with semaphore:
+            try:
+                location = await asyncio.to_thread(geocode_uncached, gmaps, unique[key])
+            except Exception as e:
+                errors[key] = f"Error geocoding address: {str(e)}"
+                return
+        if location is None:
+            errors[key] = "Address not found"
+        else:
+            resolved[key] = location
+
+    await asyncio.gather(*(fetch(key) for key in misses))
+    try:
+        await asyncio.to_thread(geocode_cache.set_many, {key: resolved[key] for key in misses if key in resolved})
+    except Exception:
+        logger.exception("Failed to write geocode cache")
+
+    results = []
+    for address, key in zip(batch.addresses, normalized):
+        if not key:
+            results.append(GeocodeBatchResult(address=address, error="Address is empty"))
+        elif key in resolved:
+            results.append(GeocodeBatchResult(address=address, **resolved[key]))
+        else:
+            results.append(GeocodeBatchResult(address=address, error=errors[key]))
+
+    return {
+        "results": [r.model_dump() for r in results],
+        "count": len(results),
+    }
 
 
-@app.get("/geocode-by-place-id")
-async def geocode_by_place_id(place_id: str = Query(..., description="Google Places place_id")):
+@router.get("/geocode-by-place-id")
+async def geocode_by_place_id(
+    request: Request,
+    place_id: str = Query(..., description="Google Places place_id"),
+    gmaps=Depends(get_gmaps),
+    response_cache: ResponseCache = Depends(get_response_cache),
+):
     """
     Geocode a place using its place_id to get coordinates.
     """
+    cache_key = ("geocode-by-place-id", place_id)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return cached_json_response(request, cached)
+
     try:
         place_details = gmaps.place(place_id=place_id, fields=["geometry", "formatted_address"])
         
@@ -124,7 +528,7 @@ async def geocode_by_place_id(place_id: str = Query(..., description="Google Pla
         if not location:
             raise HTTPException(status_code=404, detail="Place not found")
         
-        return {
+        payload = {
             "lat": location["lat"],
             "lng": location["lng"],
             "formatted_address": result.get("formatted_address", ""),
@@ -133,16 +537,21 @@ async def geocode_by_place_id(place_id: str = Query(..., description="Google Pla
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error geocoding place: {str(e)}")
 
+    return cached_json_response(request, response_cache.set(cache_key, payload))
+
 
-@app.get("/restaurants", response_model=dict)
+@router.get("/restaurants", response_model=dict)
 async def list_restaurants(
+    request: Request,
     lat: float = Query(..., description="Latitude of search center"),
     lng: float = Query(..., description="Longitude of search center"),
     radius: int = Query(5000, description="Search radius in meters (default: 5000m = ~3 miles)"),
     min_price: Optional[int] = Query(None, ge=0, le=4, description="Minimum price level (0-4)"),
     max_price: Optional[int] = Query(None, ge=0, le=4, description="Maximum price level (0-4)"),
     cuisine_type: Optional[str] = Query(None, description="Cuisine type filter (e.g., 'italian', 'chinese', 'mexican')"),
-) -> dict:
+    gmaps=Depends(get_gmaps),
+    response_cache: ResponseCache = Depends(get_response_cache),
+) -> Response:
     """
     Search for restaurants using Google Places API Nearby Search.
     
@@ -150,7 +559,14 @@ async def list_restaurants(
     - Cost: min_price and max_price (0-4 scale)
     - Distance: radius from lat/lng
     - Cuisine: cuisine_type keyword
+    
+    Responses carry an ETag; a matching If-None-Match gets a 304 while the result is cached.
     """
+    cache_key = ("restaurants", lat, lng, radius, min_price, max_price, cuisine_type)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return cached_json_response(request, cached)
+
     try:
         # Build the search query
         location = (lat, lng)
@@ -236,7 +652,7 @@ async def list_restaurants(
             )
             restaurants.append(restaurant)
         
-        return {
+        payload = {
             "restaurants": [r.model_dump() for r in restaurants],
             "count": len(restaurants),
         }
@@ -244,12 +660,24 @@ async def list_restaurants(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error searching restaurants: {str(e)}")
 
+    return cached_json_response(request, response_cache.set(cache_key, payload))
 
-@app.get("/restaurants/{place_id}", response_model=RestaurantDetail)
-async def get_restaurant_details(place_id: str) -> RestaurantDetail:
+
+@router.get("/restaurants/{place_id}", response_model=RestaurantDetail)
+async def get_restaurant_details(
+    request: Request,
+    place_id: str,
+    gmaps=Depends(get_gmaps),
+    response_cache: ResponseCache = Depends(get_response_cache),
+) -> Response:
     """
     Get detailed information about a specific restaurant, including menu data if available.
     """
+    cache_key = ("restaurant-details", place_id)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return cached_json_response(request, cached)
+
     try:
         # Get place details (don't specify fields to get all available data)
         place_details = gmaps.place(
@@ -286,11 +714,48 @@ async def get_restaurant_details(place_id: str) -> RestaurantDetail:
             menu_url=menu_url,
             photos=photos if photos else None,
         )
-        
-        return restaurant_detail
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching restaurant details: {str(e)}")
 
+    return cached_json_response(request, response_cache.set(cache_key, restaurant_detail.model_dump()))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    services: Services = app.state.services
+    # Build the Google Maps client off the event loop once the server is accepting requests
+    warm_up = asyncio.create_task(asyncio.to_thread(services.warm_up))
+    try:
+        yield
+    finally:
+        await asyncio.gather(warm_up, return_exceptions=True)
+        services.close()
+
+
+def create_app(services: Optional[Services] = None) -> FastAPI:
+    """
+    Build the API. Settings are read from the environment unless `services` is given.
+    """
+    app = FastAPI(title="Restaurant Finder API", lifespan=lifespan)
+    app.state.services = services or Services.from_env()
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    app.include_router(router)
+    return app
 
 
+def __getattr__(name: str):
+    # Build the default app on first access (`uvicorn main:app`) so that
+    # `uvicorn main:create_app --factory` does not construct a second one at import
+    if name == "app":
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
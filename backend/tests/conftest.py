@@ -1,54 +1,38 @@
 """
 Pytest configuration and shared fixtures for testing.
 """
-import os
-import sys
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
-from httpx import AsyncClient
+from httpx import ASGITransport, AsyncClient
 
-# Set a dummy API key for testing
-os.environ["GOOGLE_PLACES_API_KEY"] = "test_api_key_12345"
-
-# Create a module-level mock that will be reused
-_mock_gmaps = MagicMock()
-
-# Patch googlemaps.Client at module level so main.gmaps uses the mock when created
-_googlemaps_patcher = patch("googlemaps.Client", return_value=_mock_gmaps)
-_googlemaps_patcher.start()
+from main import Services, create_app
 
 
 @pytest.fixture
 def mock_google_maps_client():
     """Mock Google Maps client for testing."""
-    # Reset mock before each test
-    _mock_gmaps.reset_mock()
-    yield _mock_gmaps
+    yield MagicMock()
+
+
+@pytest.fixture
+def app(mock_google_maps_client) -> FastAPI:
+    """Create a fresh app whose Google Maps client is the mock."""
+    return create_app(Services(api_key="test_api_key_12345", gmaps_client=mock_google_maps_client))
 
 
 @pytest.fixture
-def client():
+def client(app: FastAPI):
     """Create a test client for the FastAPI app."""
-    # Reload main module to ensure it uses the mocked Client
-    if "main" in sys.modules:
-        del sys.modules["main"]
-    from main import app
-    # Ensure gmaps is our mock (should be from the patched Client)
-    import main
-    main.gmaps = _mock_gmaps
-    return TestClient(app)
+    with TestClient(app) as test_client:
+        yield test_client
 
 
 @pytest.fixture
-async def async_client():
+async def async_client(app: FastAPI):
     """Create an async test client for the FastAPI app."""
-    if "main" in sys.modules:
-        del sys.modules["main"]
-    from main import app
-    import main
-    main.gmaps = _mock_gmaps
-    async with AsyncClient(app=app, base_url="http://test") as ac:
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
         yield ac
 
 
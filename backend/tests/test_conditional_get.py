@@ -0,0 +1,146 @@
+"""
+Tests for ETag / If-None-Match handling on cacheable endpoints.
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from main import ResponseCache
+
+
+def test_restaurants_search_sets_etag_and_cache_control(client: TestClient, mock_google_maps_client, sample_restaurant_data):
+    """Test that restaurant search responses carry an ETag and Cache-Control."""
+    mock_google_maps_client.places_nearby.return_value = {
+        "status": "OK",
+        "results": [sample_restaurant_data]
+    }
+
+    response = client.get("/restaurants?lat=37.7749&lng=-122.4194")
+
+    assert response.status_code == 200
+    assert response.headers["etag"].startswith('"')
+    assert response.headers["cache-control"].startswith("public, max-age=")
+    assert response.json()["count"] == 1
+
+
+def test_restaurants_search_if_none_match_returns_304(client: TestClient, mock_google_maps_client, sample_restaurant_data):
+    """Test that a matching If-None-Match is answered with 304 from the cache."""
+    mock_google_maps_client.places_nearby.return_value = {
+        "status": "OK",
+        "results": [sample_restaurant_data]
+    }
+
+    first = client.get("/restaurants?lat=37.7749&lng=-122.4194")
+    etag = first.headers["etag"]
+
+    second = client.get("/restaurants?lat=37.7749&lng=-122.4194", headers={"If-None-Match": etag})
+
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["etag"] == etag
+    # The second request is served from the cache without calling Google again
+    mock_google_maps_client.places_nearby.assert_called_once()
+
+
+def test_restaurants_search_stale_etag_returns_body(client: TestClient, mock_google_maps_client, sample_restaurant_data):
+    """Test that a non-matching If-None-Match gets the full response."""
+    mock_google_maps_client.places_nearby.return_value = {
+        "status": "OK",
+        "results": [sample_restaurant_data]
+    }
+
+    response = client.get("/restaurants?lat=37.7749&lng=-122.4194", headers={"If-None-Match": '"stale"'})
+
+    assert response.status_code == 200
+    assert response.json()["count"] == 1
+
+
+def test_restaurants_search_etag_depends_on_filters(client: TestClient, mock_google_maps_client, sample_restaurant_data):
+    """Test that different result sets get different ETags."""
+    mock_google_maps_client.places_nearby.return_value = {
+        "status": "OK",
+        "results": [sample_restaurant_data]
+    }
+
+    all_prices = client.get("/restaurants?lat=37.7749&lng=-122.4194")
+    filtered = client.get("/restaurants?lat=37.7749&lng=-122.4194&min_price=4")
+
+    assert filtered.json()["count"] == 0
+    assert all_prices.headers["etag"] != filtered.headers["etag"]
+
+
+def test_restaurant_details_if_none_match_returns_304(client: TestClient, mock_google_maps_client, sample_place_details):
+    """Test conditional GET on restaurant details."""
+    mock_google_maps_client.place.return_value = sample_place_details
+
+    place_id = "ChIJN1t_tDeuEmsRUsoyG83frY4"
+    first = client.get(f"/restaurants/{place_id}")
+    assert first.status_code == 200
+
+    second = client.get(f"/restaurants/{place_id}", headers={"If-None-Match": f'W/{first.headers["etag"]}'})
+
+    assert second.status_code == 304
+    mock_google_maps_client.place.assert_called_once()
+
+
+def test_geocode_if_none_match_returns_304(client: TestClient, mock_google_maps_client):
+    """Test conditional GET on the geocode endpoint."""
+    mock_google_maps_client.geocode.return_value = [
+        {
+            "geometry": {"location": {"lat": 37.7749, "lng": -122.4194}},
+            "formatted_address": "San Francisco, CA, USA",
+        }
+    ]
+
+    first = client.get("/geocode?address=San Francisco")
+    assert first.status_code == 200
+    assert first.json()["formatted_address"] == "San Francisco, CA, USA"
+
+    second = client.get("/geocode?address=San Francisco", headers={"If-None-Match": first.headers["etag"]})
+
+    assert second.status_code == 304
+    mock_google_maps_client.geocode.assert_called_once()
+
+
+def test_errors_are_not_cached(client: TestClient, mock_google_maps_client, sample_place_details):
+    """Test that a failed lookup is retried on the next request."""
+    mock_google_maps_client.place.side_effect = Exception("API Error")
+
+    response = client.get("/restaurants/ChIJN1t_tDeuEmsRUsoyG83frY4")
+    assert response.status_code == 500
+
+    mock_google_maps_client.place.side_effect = None
+    mock_google_maps_client.place.return_value = sample_place_details
+
+    response = client.get("/restaurants/ChIJN1t_tDeuEmsRUsoyG83frY4")
+    assert response.status_code == 200
+
+
+def test_response_cache_is_bounded():
+    """Test that the response cache evicts least recently used entries beyond its size limit."""
+    cache = ResponseCache(ttl=300, max_entries=3)
+
+    for i in range(3):
+        cache.set(("restaurants", i), {"count": i})
+    # Touch the oldest entry so that entry 1 becomes the least recently used
+    assert cache.get(("restaurants", 0)) is not None
+    cache.set(("restaurants", 3), {"count": 3})
+
+    assert cache.get(("restaurants", 0)) is not None
+    assert cache.get(("restaurants", 1)) is None
+
+    for i in range(4, 100):
+        cache.set(("restaurants", i), {"count": i})
+
+    assert len(cache) == 3
+    assert cache.get(("restaurants", 99)) is not None
+
+
+def test_response_cache_drops_expired_entries_on_set():
+    """Test that expired entries are removed even if their key is never looked up again."""
+    cache = ResponseCache(ttl=0, max_entries=100)
+
+    for i in range(10):
+        cache.set(("restaurants", i), {"count": i})
+
+    # Only the entry just written remains; everything older had already expired
+    assert len(cache) == 1
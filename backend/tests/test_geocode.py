@@ -0,0 +1,244 @@
+"""
+Tests for address normalization and the geocode endpoints.
+"""
+import sqlite3
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import GeocodeCache, MAX_GEOCODE_BATCH_SIZE, Services, create_app, normalize_address
+
+
+def _geocode_result(lat, lng, formatted_address):
+    return [{"geometry": {"location": {"lat": lat, "lng": lng}}, "formatted_address": formatted_address}]
+
+
+@pytest.mark.parametrize("address", [
+    "123 Main St, San Francisco, CA",
+    "  123 main st,san francisco , ca  ",
+    "123 MAIN ST, San Francisco, CA, USA",
+    "123 Main St, San Francisco, CA, United States",
+    "123 Main St, San Francisco, CA USA",
+    "123 Main St, San Francisco, CA U.S.A.",
+    "123 Main St, San Francisco, CA US",
+    "123 Main St, San Francisco, CA United States",
+    "123 Main St, San Francisco, CA united states of america",
+    "123 Main St, San Francisco, CA, US",
+])
+def test_normalize_address_variants(address):
+    """Test that trivial spelling variants share one normalized form."""
+    assert normalize_address(address) == "123 main st, san francisco, ca"
+
+
+def test_normalize_address_strips_country_after_zip():
+    """Test that a country word directly after a ZIP code is dropped."""
+    assert normalize_address("123 Main St, San Francisco, CA 94103 USA") == "123 main st, san francisco, ca 94103"
+    assert normalize_address("123 Main St, San Francisco, CA 94103-1234 US") == "123 main st, san francisco, ca 94103-1234"
+
+
+def test_normalize_address_keeps_trailing_words_that_are_not_countries():
+    """Test that a country-like word is only stripped after a state code or ZIP."""
+    assert normalize_address("Pizza, Eat With Us") != normalize_address("Pizza, Eat With")
+
+
+def test_normalize_address_keeps_country_only_address():
+    """Test that an address consisting only of a country is not emptied."""
+    assert normalize_address("USA") == "usa"
+
+
+@pytest.mark.parametrize("with_country, without_country", [
+    ("Paris, USA", "Paris"),
+    ("Birmingham, US", "Birmingham"),
+])
+def test_normalize_address_keeps_country_of_bare_place_names(with_country, without_country):
+    """Test that the country is kept when it is what tells two places apart."""
+    assert normalize_address(with_country) != normalize_address(without_country)
+
+
+def test_normalize_address_keeps_single_part_names():
+    """Test that a trailing country-like word is kept when there is no comma-separated address."""
+    assert normalize_address("Cafe Us") == "cafe us"
+
+
+def test_geocode_cache_persists_to_disk(tmp_path):
+    """Test that cached coordinates survive reopening the cache file."""
+    path = str(tmp_path / "geocode.sqlite3")
+    cache = GeocodeCache(path)
+    cache.set("123 main st", {"lat": 1.0, "lng": 2.0, "formatted_address": "123 Main St"})
+    cache.close()
+
+    reopened = GeocodeCache(path)
+    assert reopened.get("123 main st") == {"lat": 1.0, "lng": 2.0, "formatted_address": "123 Main St"}
+    assert reopened.get("456 main st") is None
+    reopened.close()
+
+
+def test_geocode_reuses_normalized_address(client: TestClient, mock_google_maps_client):
+    """Test that the single geocode endpoint reuses results across address variants."""
+    mock_google_maps_client.geocode.return_value = _geocode_result(37.7749, -122.4194, "San Francisco, CA, USA")
+
+    first = client.get("/geocode?address=San Francisco, CA")
+    second = client.get("/geocode?address=san francisco, ca, USA")
+
+    assert first.json() == second.json()
+    mock_google_maps_client.geocode.assert_called_once_with("San Francisco, CA")
+
+
+def test_geocode_batch_deduplicates_and_preserves_order(client: TestClient, mock_google_maps_client):
+    """Test that duplicate addresses are fetched once and results keep input order."""
+    locations = {
+        "1 Market St, San Francisco": _geocode_result(37.79, -122.39, "1 Market St"),
+        "Oakland, CA": _geocode_result(37.80, -122.27, "Oakland, CA, USA"),
+    }
+    mock_google_maps_client.geocode.side_effect = lambda address: locations[address]
+
+    response = client.post("/geocode:batch", json={"addresses": [
+        "1 Market St, San Francisco",
+        "Oakland, CA",
+        "1 MARKET ST,  San Francisco, USA",
+    ]})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["count"] == 3
+    assert [r["address"] for r in data["results"]] == [
+        "1 Market St, San Francisco",
+        "Oakland, CA",
+        "1 MARKET ST,  San Francisco, USA",
+    ]
+    assert data["results"][0]["lat"] == 37.79
+    assert data["results"][1]["lat"] == 37.80
+    assert data["results"][2]["lat"] == 37.79
+    assert mock_google_maps_client.geocode.call_count == 2
+
+
+def test_geocode_batch_uses_cache_across_requests(client: TestClient, mock_google_maps_client):
+    """Test that a second batch only fetches addresses it has not seen before."""
+    mock_google_maps_client.geocode.return_value = _geocode_result(37.79, -122.39, "1 Market St")
+
+    client.post("/geocode:batch", json={"addresses": ["1 Market St"]})
+    response = client.post("/geocode:batch", json={"addresses": ["1 market st", "2 Market St"]})
+
+    assert response.status_code == 200
+    assert [r["error"] for r in response.json()["results"]] == [None, None]
+    assert [c.args[0] for c in mock_google_maps_client.geocode.call_args_list] == ["1 Market St", "2 Market St"]
+
+
+def test_geocode_batch_per_item_errors(client: TestClient, mock_google_maps_client):
+    """Test that failures are reported per item without failing the batch."""
+    def geocode(address):
+        if address == "nowhere":
+            return []
+        if address == "boom":
+            raise Exception("API Error")
+        return _geocode_result(1.0, 2.0, address)
+
+    mock_google_maps_client.geocode.side_effect = geocode
+
+    response = client.post("/geocode:batch", json={"addresses": ["somewhere", "nowhere", "boom", "   "]})
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert results[0]["error"] is None and results[0]["lat"] == 1.0
+    assert results[1]["error"] == "Address not found"
+    assert "Error geocoding address" in results[2]["error"]
+    assert results[3]["error"] == "Address is empty"
+
+
+def test_geocode_batch_failures_are_not_cached(client: TestClient, mock_google_maps_client):
+    """Test that addresses that failed are retried in a later batch."""
+    mock_google_maps_client.geocode.return_value = []
+    client.post("/geocode:batch", json={"addresses": ["1 Market St"]})
+
+    mock_google_maps_client.geocode.return_value = _geocode_result(37.79, -122.39, "1 Market St")
+    response = client.post("/geocode:batch", json={"addresses": ["1 Market St"]})
+
+    assert response.json()["results"][0]["lat"] == 37.79
+    assert mock_google_maps_client.geocode.call_count == 2
+
+
+def test_geocode_batch_too_large(client: TestClient):
+    """Test that batches over the size limit are rejected."""
+    response = client.post("/geocode:batch", json={"addresses": ["a"] * (MAX_GEOCODE_BATCH_SIZE + 1)})
+    assert response.status_code == 422
+
+
+def test_geocode_batch_survives_cache_write_failure(client: TestClient, app, mock_google_maps_client, monkeypatch):
+    """Test that a failing cache write (e.g. a locked database) still returns the results."""
+    mock_google_maps_client.geocode.return_value = _geocode_result(37.79, -122.39, "1 Market St")
+
+    def locked(locations):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(app.state.services.geocode_cache, "set_many", locked)
+
+    response = client.post("/geocode:batch", json={"addresses": ["1 Market St"]})
+
+    assert response.status_code == 200
+    assert response.json()["results"][0]["lat"] == 37.79
+
+
+def test_geocode_batch_serves_cache_hits_without_api_key():
+    """Test that a missing API key only fails the addresses that are not cached."""
+    services = Services(api_key=None)
+    services.geocode_cache.set("1 market st", {"lat": 37.79, "lng": -122.39, "formatted_address": "1 Market St"})
+
+    with TestClient(create_app(services)) as client:
+        response = client.post("/geocode:batch", json={"addresses": ["1 Market St"]})
+        assert response.status_code == 200
+        assert response.json()["results"][0]["lat"] == 37.79
+
+        response = client.post("/geocode:batch", json={"addresses": ["1 Market St", "2 Market St"]})
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert results[0]["lat"] == 37.79
+        assert "GOOGLE_PLACES_API_KEY" in results[1]["error"]
+
+
+def test_geocode_serves_cache_hits_without_api_key():
+    """Test that the single geocode endpoint answers cached addresses without an API key."""
+    services = Services(api_key=None)
+    services.geocode_cache.set("1 market st", {"lat": 37.79, "lng": -122.39, "formatted_address": "1 Market St"})
+
+    with TestClient(create_app(services)) as client:
+        response = client.get("/geocode?address=1 Market St")
+        assert response.status_code == 200
+        assert response.json()["lat"] == 37.79
+
+        response = client.get("/geocode?address=2 Market St")
+        assert response.status_code == 503
+        assert "GOOGLE_PLACES_API_KEY" in response.json()["detail"]
+
+
+def test_geocode_falls_back_to_google_on_cache_failure(client: TestClient, app, mock_google_maps_client, monkeypatch):
+    """Test that a failing geocode cache (e.g. a locked database) does not fail the request."""
+    mock_google_maps_client.geocode.return_value = _geocode_result(37.79, -122.39, "1 Market St")
+
+    def locked(*args):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(app.state.services.geocode_cache, "get", locked)
+    monkeypatch.setattr(app.state.services.geocode_cache, "set", locked)
+
+    response = client.get("/geocode?address=1 Market St")
+
+    assert response.status_code == 200
+    assert response.json()["lat"] == 37.79
+
+
+@pytest.mark.parametrize("concurrency", ["0", "-3"])
+def test_geocode_batch_concurrency_is_at_least_one(monkeypatch, mock_google_maps_client, concurrency):
+    """Test that a non-positive GEOCODE_BATCH_CONCURRENCY still lets batches complete."""
+    monkeypatch.setenv("GEOCODE_BATCH_CONCURRENCY", concurrency)
+    monkeypatch.setenv("GEOCODE_CACHE_PATH", ":memory:")
+    services = Services.from_env()
+    assert services.geocode_concurrency == 1
+
+    services = Services(api_key=None, geocode_concurrency=int(concurrency), gmaps_client=mock_google_maps_client)
+    mock_google_maps_client.geocode.return_value = _geocode_result(37.79, -122.39, "1 Market St")
+
+    with TestClient(create_app(services)) as client:
+        response = client.post("/geocode:batch", json={"addresses": ["1 Market St", "2 Market St"]})
+
+    assert response.status_code == 200
+    assert [r["error"] for r in response.json()["results"]] == [None, None]
@@ -0,0 +1,108 @@
+"""
+Tests for app construction, lifespan-managed resources and startup time budgets.
+"""
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from main import Services, create_app
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Generous ceilings so the tests catch regressions (e.g. eager client creation) rather than machine noise
+IMPORT_BUDGET_SECONDS = 2.0
+COLD_START_BUDGET_SECONDS = 1.0
+
+
+def test_import_is_fast_and_lazy():
+    """Test that importing main needs no API key, builds no app, skips googlemaps and stays within budget."""
+    env = {k: v for k, v in os.environ.items() if k != "GOOGLE_PLACES_API_KEY"}
+    script = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        "import main\n"
+        "print(time.perf_counter() - start)\n"
+        "print('googlemaps' in sys.modules)\n"
+        "print('app' in vars(main))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    elapsed, googlemaps_loaded, app_built = result.stdout.split()
+
+    assert googlemaps_loaded == "False"
+    assert app_built == "False"
+    assert float(elapsed) < IMPORT_BUDGET_SECONDS
+
+
+def test_cold_start_within_budget():
+    """Test that building the app and serving the first request stays within budget."""
+    start = time.perf_counter()
+    with TestClient(create_app(Services(api_key=None))) as client:
+        response = client.get("/health")
+    elapsed = time.perf_counter() - start
+
+    assert response.status_code == 200
+    assert elapsed < COLD_START_BUDGET_SECONDS
+
+
+def test_missing_api_key_only_fails_google_endpoints():
+    """Test that a missing API key returns 503 for Google-backed endpoints but not health."""
+    with TestClient(create_app(Services(api_key=None))) as client:
+        assert client.get("/health").status_code == 200
+
+        response = client.get("/restaurants?lat=37.7749&lng=-122.4194")
+        assert response.status_code == 503
+        assert "GOOGLE_PLACES_API_KEY" in response.json()["detail"]
+
+
+def test_malformed_api_key_returns_503():
+    """Test that a key googlemaps rejects gives a 503 instead of an unhandled error."""
+    services = Services(api_key="bad_key")
+
+    with TestClient(create_app(services)) as client:
+        for _ in range(2):
+            response = client.get("/restaurants?lat=37.7749&lng=-122.4194")
+            assert response.status_code == 503
+            assert "Invalid GOOGLE_PLACES_API_KEY" in response.json()["detail"]
+
+        assert client.get("/health").status_code == 200
+
+
+def test_lifespan_warms_up_and_closes_client():
+    """Test that the Google Maps client is built in the background and closed on shutdown."""
+    services = Services(api_key="AIzaTestApiKey12345")
+
+    with TestClient(create_app(services)):
+        deadline = time.monotonic() + COLD_START_BUDGET_SECONDS
+        while services._gmaps is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert services._gmaps is not None
+
+    assert services._gmaps is None
+
+
+def test_default_app_is_built_on_first_access():
+    """Test that `main:app` is created lazily and then reused."""
+    import main
+
+    assert main.app is main.app
+    assert main.app.state.services is not None
+
+
+def test_apps_do_not_share_caches():
+    """Test that each app instance owns its own response cache."""
+    first = create_app(Services(api_key=None))
+    second = create_app(Services(api_key=None))
+
+    assert first.state.services.response_cache is not second.state.services.response_cache